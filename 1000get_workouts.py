@@ -5,10 +5,10 @@ import time
 import csv
 from datetime import datetime
 from collections import defaultdict
-from whoop_client import WhoopClient
+from whoop_client import WhoopClient, default_end_date
 # ---------------- CONFIG ---------------- #
 START_DATE = datetime(2024, 12, 13).isoformat() + "Z"
-END_DATE = datetime.utcnow().isoformat() + "Z"
+END_DATE = default_end_date()  # now, or WHOOP_END_DATE / next midnight when the HTTP cache is on
 MAX_WORKOUTS = 1000  # Limit to 100 workouts
 OUTPUT_JSON = "workouts.json"
 OUTPUT_CSV = "workouts.csv"
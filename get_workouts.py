@@ -1,7 +1,7 @@
 import os
 import json
 from datetime import datetime
-from whoop_client import WhoopClient
+from whoop_client import WhoopClient, default_end_date
 # Load credentials from environment
 CLIENT_ID = os.getenv("WHOOP_CLIENT_ID")
 CLIENT_SECRET = os.getenv("WHOOP_CLIENT_SECRET")
@@ -15,7 +15,7 @@ client = WhoopClient(
 client.load_token()  # Load saved token.json
 # Define date range
 start_date = datetime(2024, 12, 13).isoformat() + "Z"  # fixed start
-end_date = datetime.utcnow().isoformat() + "Z"         # dynamic end (today)
+end_date = default_end_date()                           # dynamic end (today, or WHOOP_END_DATE)
 print(f"📡 Fetching workouts from {start_date} to {end_date}...")
 workouts = client.get_workout_collection(start=start_date, end=end_date)
 with open("workouts.json", "w") as f:
@@ -0,0 +1,156 @@
+import re
+import json
+import time
+import sqlite3
+import threading
+from urllib.parse import urlsplit, parse_qsl, urlencode
+from requests import Response, ConnectionError
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+# ---------------- CONFIG ---------------- #
+HTTP_CACHE_DB = "http_cache.sqlite3"
+MAX_CACHE_BYTES = 200 * 1024 * 1024
+
+# Seconds a recorded response stays fresh, by API path after /v<N>/. Only these
+# collection endpoints are cached; single records fetched by id (e.g.
+# /activity/workout/<id>, /cycle/<id>/recovery) always go to the network so
+# webhook-driven refreshes never see a stale copy.
+ENDPOINT_TTLS = {
+    "user/profile": 7 * 86400,
+    "user/profile/basic": 7 * 86400,
+    "recovery": 3600,
+    "activity/sleep": 3600,
+    "activity/workout": 3600,
+    "cycle": 3600,
+}
+_API_PATH = re.compile(r"/v\d+/(.+?)/?$")
+
+# off:    no caching, every request goes to the network
+# record: serve fresh recorded responses, otherwise fetch and record
+# replay: serve recorded responses only (ignoring TTLs); never touch the network
+CACHE_MODES = ("off", "record", "replay")
+
+
+class CacheMissError(ConnectionError):
+    """Raised in replay mode when a request has no recorded response."""
+
+
+def cache_key(method, url):
+    """Method + path + sorted query params (start, end, next_token, ...); auth headers are ignored."""
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return f"{method.upper()} {parts.netloc}{parts.path}?{query}"
+
+
+def ttl_for(url):
+    """TTL in seconds for a cacheable collection endpoint, None for anything else."""
+    match = _API_PATH.search(urlsplit(url).path)
+    return ENDPOINT_TTLS.get(match.group(1)) if match else None
+
+
+class ResponseStore:
+    """SQLite store of recorded responses, evicting least recently used entries past `max_bytes`."""
+
+    def __init__(self, path=HTTP_CACHE_DB, max_bytes=MAX_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )"""
+        )
+        self._conn.commit()
+
+    def get(self, key):
+        """Return (url, status, headers, body, stored_at) or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, status, headers, body, stored_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+        url, status, headers, body, stored_at = row
+        return url, status, json.loads(headers), bytes(body), stored_at
+
+    def put(self, key, url, status, headers, body):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, status, json.dumps(headers), body, len(body), now, now),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        stale = []
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY last_access"):
+            if total <= self.max_bytes:
+                break
+            stale.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", stale)
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+
+class RecordReplayAdapter(HTTPAdapter):
+    """Transport adapter that records successful GET responses and replays them."""
+
+    def __init__(self, store, mode="record", **kwargs):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Unsupported cache mode '{mode}' (expected one of {CACHE_MODES})")
+        super().__init__(**kwargs)
+        self.store = store
+        self.mode = mode
+
+    def send(self, request, **kwargs):
+        cacheable = request.method == "GET" and ttl_for(request.url) is not None
+        if self.mode == "off" or (self.mode == "record" and not cacheable):
+            return super().send(request, **kwargs)
+
+        key = cache_key(request.method, request.url)
+        cached = self.store.get(key) if cacheable else None
+        if cached is not None:
+            url, status, headers, body, stored_at = cached
+            if self.mode == "replay" or time.time() - stored_at < ttl_for(url):
+                return self._build_response(request, status, headers, body)
+        if self.mode == "replay":
+            # Strict offline: uncached and by-id requests never reach the network
+            raise CacheMissError(f"No recorded response for {key}", request=request)
+
+        resp = super().send(request, **kwargs)
+        if resp.status_code == 200:
+            headers = {k: v for k, v in resp.headers.items() if k.lower() not in ("set-cookie", "content-encoding", "content-length")}
+            self.store.put(key, request.url, resp.status_code, headers, resp.content)
+        return resp
+
+    def _build_response(self, request, status, headers, body):
+        resp = Response()
+        resp.status_code = status
+        resp.headers = CaseInsensitiveDict(headers)
+        resp.headers["X-Cache"] = "HIT"
+        resp._content = body
+        resp.encoding = "utf-8"
+        resp.url = request.url
+        resp.request = request
+        resp.reason = "OK"
+        resp.connection = self
+        return resp
@@ -0,0 +1,321 @@
+import os
+import json
+import time
+import hmac
+import base64
+import hashlib
+import sqlite3
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from requests import HTTPError, RequestException
+from authlib.integrations.base_client.errors import OAuthError
+from dotenv import load_dotenv
+from whoop_client import WhoopClient
+from local_store import apply_changes
+
+# ---------------- CONFIG ---------------- #
+HOST = os.getenv("WHOOP_INGEST_HOST", "127.0.0.1")
+PORT = int(os.getenv("WHOOP_INGEST_PORT", "8765"))
+QUEUE_DB = "webhook_queue.sqlite3"
+DATA_DIR = "."
+BATCH_WINDOW_SEC = 2.0   # wait this long after the first event so bursts coalesce
+BATCH_SIZE = 200         # max queued events handled per batch
+MAX_ATTEMPTS = 8         # move an event to dead_letters after this many failed fetches
+RETRY_BASE_SEC = 5       # backoff after a failed fetch: 5 s, 10 s, 20 s ... capped below
+RETRY_MAX_SEC = 30 * 60
+RATE_LIMIT_SLEEP_SEC = 30
+WORKER_ERROR_SLEEP_SEC = 30
+SIGNATURE_MAX_AGE_SEC = 5 * 60  # reject signed requests older (or newer) than this
+
+EVENT_TYPES = {
+    "workout.updated", "workout.deleted",
+    "sleep.updated", "sleep.deleted",
+    "recovery.updated", "recovery.deleted",
+}
+
+
+# ---------------- DURABLE QUEUE ---------------- #
+class EventQueue:
+    """SQLite-backed FIFO of webhook events; survives restarts until acknowledged.
+
+    Failed events are retried with exponential backoff and moved to the
+    dead_letters table (not deleted) once MAX_ATTEMPTS is reached.
+    """
+
+    def __init__(self, path=QUEUE_DB):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS events (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                event_type TEXT NOT NULL,
+                record_id TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                received_at REAL NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL DEFAULT 0
+            )"""
+        )
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS dead_letters (
+                seq INTEGER PRIMARY KEY,
+                event_type TEXT NOT NULL,
+                record_id TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                received_at REAL NOT NULL,
+                attempts INTEGER NOT NULL,
+                failed_at REAL NOT NULL
+            )"""
+        )
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(events)")]
+        if "next_attempt_at" not in columns:  # queue created before backoff existed
+            self._conn.execute("ALTER TABLE events ADD COLUMN next_attempt_at REAL NOT NULL DEFAULT 0")
+        self._conn.commit()
+        self.has_events = threading.Event()
+        if self.pending():
+            self.has_events.set()
+
+    def put(self, event):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO events (event_type, record_id, payload, received_at) VALUES (?, ?, ?, ?)",
+                (event["type"], str(event["id"]), json.dumps(event), time.time()),
+            )
+            self._conn.commit()
+        self.has_events.set()
+
+    def take(self, limit=BATCH_SIZE):
+        """Return up to `limit` oldest due events as (seq, event_type, record_id, attempts)."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT seq, event_type, record_id, attempts FROM events "
+                "WHERE next_attempt_at <= ? ORDER BY seq LIMIT ?",
+                (time.time(), limit),
+            ).fetchall()
+
+    def ack(self, seqs):
+        with self._lock:
+            self._conn.executemany("DELETE FROM events WHERE seq = ?", [(s,) for s in seqs])
+            self._conn.commit()
+
+    def retry(self, seqs):
+        """Schedule failed events with exponential backoff; dead-letter exhausted ones."""
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE events SET attempts = attempts + 1, "
+                "next_attempt_at = ? + MIN(?, ? * (1 << attempts)) WHERE seq = ?",
+                [(now, RETRY_MAX_SEC, RETRY_BASE_SEC, s) for s in seqs],
+            )
+            self._conn.execute(
+                "INSERT INTO dead_letters "
+                "SELECT seq, event_type, record_id, payload, received_at, attempts, ? FROM events WHERE attempts >= ?",
+                (now, MAX_ATTEMPTS),
+            )
+            dead = self._conn.execute("DELETE FROM events WHERE attempts >= ?", (MAX_ATTEMPTS,)).rowcount
+            self._conn.commit()
+        if dead:
+            print(f"⚠️ Moved {dead} events to dead_letters after {MAX_ATTEMPTS} failed attempts")
+
+    def seconds_until_due(self):
+        """Seconds until the next queued event may be tried (0 if one is due), None if empty."""
+        with self._lock:
+            next_at = self._conn.execute("SELECT MIN(next_attempt_at) FROM events").fetchone()[0]
+        return None if next_at is None else max(0.0, next_at - time.time())
+
+    def pending(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+
+
+# ---------------- SIGNATURE ---------------- #
+def verify_signature(secret, timestamp, body, signature, now=None):
+    """WHOOP signs base64(HMAC-SHA256(timestamp + raw body)) with the client secret.
+
+    `timestamp` is epoch milliseconds; stale ones are rejected so captured
+    requests can't be replayed.
+    """
+    if not secret or not timestamp or not signature:
+        return False
+    try:
+        age_sec = (time.time() if now is None else now) - int(timestamp) / 1000
+    except ValueError:
+        return False
+    if abs(age_sec) > SIGNATURE_MAX_AGE_SEC:
+        return False
+    digest = hmac.new(secret.encode(), timestamp.encode() + body, hashlib.sha256).digest()
+    return hmac.compare_digest(base64.b64encode(digest).decode(), signature)
+
+
+def sign(secret, timestamp, body):
+    digest = hmac.new(secret.encode(), timestamp.encode() + body, hashlib.sha256).digest()
+    return base64.b64encode(digest).decode()
+
+
+# ---------------- WORKER ---------------- #
+def coalesce(rows):
+    """Keep only the newest event per (resource, record id).
+
+    Returns {(resource, record_id): (action, [seq, ...])} — every seq folded into
+    a key is acknowledged together once that key is applied.
+    """
+    latest = {}
+    for seq, event_type, record_id, _attempts in rows:
+        resource, action = event_type.split(".", 1)
+        key = (resource, record_id)
+        seqs = latest[key][1] if key in latest else []
+        seqs.append(seq)
+        latest[key] = (action, seqs)
+    return latest
+
+
+def fetch_record(client, resource, record_id):
+    if resource == "workout":
+        return client.get_workout(record_id)
+    if resource == "sleep":
+        return client.get_sleep(record_id)
+    # Recovery events carry the sleep id; recoveries are looked up by cycle
+    sleep = client.get_sleep(record_id)
+    return client.get_recovery_for_cycle(sleep["cycle_id"])
+
+
+def process_batch(client, queue, data_dir=DATA_DIR):
+    """Fetch/delete one coalesced batch and write each resource file once."""
+    rows = queue.take()
+    if not rows:
+        return 0
+
+    changes = {}   # resource -> {"upserts": [...], "deletes": [...]}
+    done, failed = [], []
+    for (resource, record_id), (action, seqs) in coalesce(rows).items():
+        change = changes.setdefault(resource, {"upserts": [], "deletes": []})
+        if action == "deleted":
+            change["deletes"].append(record_id)
+            done.extend(seqs)
+            continue
+        try:
+            change["upserts"].append(fetch_record(client, resource, record_id))
+            done.extend(seqs)
+        except HTTPError as e:
+            status = e.response.status_code if e.response is not None else None
+            if status == 404:
+                change["deletes"].append(record_id)  # record vanished before we fetched it
+                done.extend(seqs)
+            elif status == 429:
+                print(f"⚠️ Rate limit hit — sleeping for {RATE_LIMIT_SLEEP_SEC} seconds...")
+                time.sleep(RATE_LIMIT_SLEEP_SEC)
+                break  # rest of the batch stays queued
+            else:
+                print(f"⚠️ Failed to fetch {resource} {record_id}: {e}")
+                failed.extend(seqs)
+        except (RequestException, OAuthError) as e:
+            # Network errors, expired/unrefreshable tokens: keep the event and back off
+            print(f"⚠️ Failed to fetch {resource} {record_id}: {e!r}")
+            failed.extend(seqs)
+
+    for resource, change in changes.items():
+        if change["upserts"] or change["deletes"]:
+            total = apply_changes(resource, change["upserts"], change["deletes"], data_dir)
+            print(f"💾 {resource}: {len(change['upserts'])} upserted, {len(change['deletes'])} deleted ({total} stored)")
+
+    queue.ack(done)
+    queue.retry(failed)
+    return len(done)
+
+
+def run_worker(client, queue, stop, data_dir=DATA_DIR):
+    while not stop.is_set():
+        queue.has_events.clear()
+        due_in = queue.seconds_until_due()
+        if due_in is None or due_in > 0:
+            # Nothing due yet: sleep until a new event arrives or a backoff expires
+            queue.has_events.wait(timeout=min(due_in or 1.0, 1.0))
+            continue
+        time.sleep(BATCH_WINDOW_SEC)
+        try:
+            process_batch(client, queue, data_dir)
+        except Exception as e:
+            # Never let the worker die silently; unacknowledged events stay queued
+            print(f"⚠️ Ingest batch failed: {e!r} — retrying in {WORKER_ERROR_SLEEP_SEC} seconds...")
+            stop.wait(WORKER_ERROR_SLEEP_SEC)
+
+
+# ---------------- HTTP SERVER ---------------- #
+def make_handler(queue, secret):
+    class WebhookHandler(BaseHTTPRequestHandler):
+        def _reply(self, status, body=None):
+            payload = json.dumps(body).encode() if body is not None else b""
+            self.send_response(status)
+            if payload:
+                self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._reply(200, {"status": "ok", "pending": queue.pending()})
+            else:
+                self._reply(404, {"error": "not found"})
+
+        def do_POST(self):
+            if self.path != "/webhook":
+                self._reply(404, {"error": "not found"})
+                return
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if not verify_signature(
+                secret,
+                self.headers.get("X-WHOOP-Signature-Timestamp"),
+                body,
+                self.headers.get("X-WHOOP-Signature"),
+            ):
+                self._reply(401, {"error": "invalid signature"})
+                return
+            try:
+                event = json.loads(body)
+            except ValueError:
+                self._reply(400, {"error": "invalid JSON"})
+                return
+            if not isinstance(event, dict) or event.get("type") not in EVENT_TYPES or not event.get("id"):
+                self._reply(400, {"error": "unsupported event"})
+                return
+            queue.put(event)
+            self._reply(204)
+
+        def log_message(self, format, *args):
+            pass
+
+    return WebhookHandler
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    CLIENT_ID = os.getenv("WHOOP_CLIENT_ID")
+    CLIENT_SECRET = os.getenv("WHOOP_CLIENT_SECRET")
+    REDIRECT_URI = os.getenv("WHOOP_REDIRECT_URI")
+    if not CLIENT_SECRET:
+        raise ValueError("❌ Missing WHOOP_CLIENT_SECRET in .env — it is needed to verify webhook signatures")
+
+    client = WhoopClient(
+        client_id=CLIENT_ID,
+        client_secret=CLIENT_SECRET,
+        redirect_uri=REDIRECT_URI,
+        cache_mode="off",  # always fetch live records, whatever WHOOP_HTTP_CACHE says
+    )
+    client.load_token()  # Load saved token.json
+
+    queue = EventQueue(QUEUE_DB)
+    stop = threading.Event()
+    worker = threading.Thread(target=run_worker, args=(client, queue, stop), daemon=True)
+    worker.start()
+
+    server = ThreadingHTTPServer((HOST, PORT), make_handler(queue, CLIENT_SECRET))
+    print(f"📡 Listening for WHOOP webhooks on http://{HOST}:{PORT}/webhook ({queue.pending()} queued)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n⚠️ Shutting down — unprocessed events stay queued.")
+    finally:
+        stop.set()
+        server.server_close()
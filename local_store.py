@@ -0,0 +1,79 @@
+import os
+import json
+import threading
+
+# ---------------- CONFIG ---------------- #
+# Resource -> (JSON file, field that identifies a record)
+STORE_FILES = {
+    "workout": ("workouts.json", "id"),
+    "sleep": ("sleep.json", "id"),
+    "recovery": ("recovery.json", "sleep_id"),
+}
+
+_lock = threading.Lock()
+
+
+def _load(path):
+    """Return (records, wrapped) — wrapped is True for the API's {"records": [...]} layout."""
+    if not os.path.exists(path):
+        return [], False
+    with open(path, "r") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        return data.get("records", []), True
+    return data, False
+
+
+def unique_records(data, key="id"):
+    """Records from a list or {"records": [...]} payload, keeping the first copy of each id.
+
+    Files are stored newest-first, so the first copy is the latest one. Every
+    consumer (reports, zone store, query API) loads through here so their
+    numbers agree.
+    """
+    records = data.get("records", []) if isinstance(data, dict) else data
+    seen, unique = set(), []
+    for rec in records:
+        if rec.get(key) in seen:
+            continue
+        seen.add(rec.get(key))
+        unique.append(rec)
+    return unique
+
+
+def load_workouts(path="workouts.json"):
+    """De-duplicated workout records from `path` ([] if the file is missing)."""
+    return unique_records(_load(path)[0])
+
+
+def _save(path, records, wrapped):
+    """Write atomically so readers never see a half-written file."""
+    data = {"records": records} if wrapped else records
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=4)
+    os.replace(tmp_path, path)
+
+
+def apply_changes(resource, upserts=(), deletes=(), data_dir="."):
+    """Upsert and delete records of one resource in a single read/write of its JSON file.
+
+    Records are kept newest-first (by `start`, falling back to `created_at`),
+    matching what the WHOOP collection endpoints return.
+    """
+    filename, key = STORE_FILES[resource]
+    path = os.path.join(data_dir, filename)
+    with _lock:
+        records, wrapped = _load(path)
+        by_id = {rec.get(key): rec for rec in records}
+        for record_id in deletes:
+            by_id.pop(record_id, None)
+        for rec in upserts:
+            by_id[rec.get(key)] = rec
+        merged = sorted(
+            by_id.values(),
+            key=lambda rec: rec.get("start") or rec.get("created_at") or "",
+            reverse=True,
+        )
+        _save(path, merged, wrapped)
+    return len(merged)
@@ -0,0 +1,169 @@
+import os
+import json
+import hashlib
+import threading
+from functools import lru_cache
+from urllib.parse import urlparse, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+import pandas as pd
+from local_store import unique_records
+from workout_rollups import (
+    build_daily_rollup,
+    filter_rollup,
+    summary_stats,
+    weekly_trends,
+    sport_frequency,
+    weekday_profile,
+)
+from zone_store import ZONE_LABELS, zone_arrays, zone_means
+
+# ---------------- CONFIG ---------------- #
+HOST = os.getenv("WHOOP_QUERY_HOST", "127.0.0.1")
+PORT = int(os.getenv("WHOOP_QUERY_PORT", "8766"))
+INPUT_JSON = "workouts.json"
+CACHE_SIZE = 1024
+
+
+def _file_version(stat):
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+
+class Snapshot:
+    """Rollup and zone store built from one data version (hashed by version)."""
+
+    def __init__(self, version, rollup, zones):
+        self.version = version
+        self.rollup = rollup
+        self.zones = zones
+
+    def __hash__(self):
+        return hash(self.version)
+
+    def __eq__(self, other):
+        return isinstance(other, Snapshot) and other.version == self.version
+
+
+class QueryEngine:
+    """Answers queries from the daily rollup; reloads when the source file changes."""
+
+    def __init__(self, path=INPUT_JSON):
+        self.path = path
+        self.snapshot = None
+        self._lock = threading.Lock()
+        self._cached = lru_cache(maxsize=CACHE_SIZE)(self._compute)
+
+    def refresh(self):
+        """Return the current snapshot, rebuilding it (and dropping cached results) after a data sync."""
+        snapshot = self.snapshot
+        if snapshot is not None and snapshot.version == _file_version(os.stat(self.path)):
+            return snapshot
+        with self._lock:
+            snapshot = self.snapshot
+            if snapshot is None or snapshot.version != _file_version(os.stat(self.path)):
+                with open(self.path, "r") as f:
+                    workouts = unique_records(json.load(f))
+                    # fstat of the file we actually read: writers replace the file atomically,
+                    # so this version always describes `workouts`
+                    version = _file_version(os.fstat(f.fileno()))
+                snapshot = Snapshot(version, build_daily_rollup(workouts), zone_arrays(workouts))
+                self.snapshot = snapshot
+                self._cached.cache_clear()
+                print(f"🔄 Loaded rollups from {self.path} ({len(snapshot.rollup)} day/sport rows)")
+        return snapshot
+
+    def query(self, endpoint, start=None, end=None, sport=None):
+        """Return (JSON body bytes, ETag) for an endpoint and filter, cached per data version."""
+        return self._cached(self.refresh(), endpoint, start, end, sport)
+
+    def _compute(self, snapshot, endpoint, start, end, sport):
+        if endpoint == "zones":
+            data = zone_distribution(snapshot.zones, start, end, sport)
+        else:
+            data = ENDPOINTS[endpoint](filter_rollup(snapshot.rollup, start, end, sport))
+        result = {"filter": {"start": start, "end": end, "sport": sport}, endpoint: data}
+        body = json.dumps(result, default=str).encode()
+        etag = '"' + hashlib.sha1(snapshot.version.encode() + body).hexdigest() + '"'
+        return body, etag
+
+
+def zone_distribution(store, start=None, end=None, sport=None):
+    """Mean zone durations (ms) from the zone store, with the rollup's UTC-date filter."""
+    mask = np.ones(len(store), dtype=bool)
+    if start:
+        mask &= store.starts >= pd.Timestamp(start, tz="UTC").timestamp()
+    if end:
+        mask &= store.starts < (pd.Timestamp(end, tz="UTC") + pd.Timedelta(days=1)).timestamp()
+    if sport:
+        mask &= store.sport_codes == store.sport_code(sport)
+    means = zone_means(store, mask)
+    return {label: None if np.isnan(m) else round(float(m), 2) for label, m in zip(ZONE_LABELS, means)}
+
+
+ENDPOINTS = {
+    "summary": summary_stats,
+    "weekly": weekly_trends,
+    "sports": sport_frequency,
+    "weekday": weekday_profile,
+    "zones": zone_distribution,  # served from the zone store, see _compute
+}
+
+
+# ---------------- HTTP SERVER ---------------- #
+def make_handler(engine):
+    class QueryHandler(BaseHTTPRequestHandler):
+        def _reply(self, status, body=b"", etag=None):
+            self.send_response(status)
+            if etag:
+                self.send_header("ETag", etag)
+                self.send_header("Cache-Control", "no-cache")
+            if body:
+                self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            endpoint = url.path.strip("/")
+            if endpoint not in ENDPOINTS:
+                self._reply(404, json.dumps({"error": "not found", "endpoints": list(ENDPOINTS)}).encode())
+                return
+            params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            try:
+                for key in ("start", "end"):
+                    if params.get(key):
+                        params[key] = pd.Timestamp(params[key]).date().isoformat()
+                body, etag = engine.query(endpoint, params.get("start"), params.get("end"), params.get("sport"))
+            except ValueError as e:
+                self._reply(400, json.dumps({"error": str(e)}).encode())
+                return
+            except Exception as e:
+                print(f"⚠️ {self.path} failed: {e!r}")
+                self._reply(500, json.dumps({"error": "internal error"}).encode())
+                return
+            if self.headers.get("If-None-Match") == etag:
+                self._reply(304, etag=etag)
+            else:
+                self._reply(200, body, etag)
+
+        def log_message(self, format, *args):
+            pass
+
+    return QueryHandler
+
+
+if __name__ == "__main__":
+    if not os.path.exists(INPUT_JSON):
+        raise FileNotFoundError(f"❌ {INPUT_JSON} not found. Please run get_workouts.py first.")
+
+    engine = QueryEngine(INPUT_JSON)
+    engine.refresh()
+    server = ThreadingHTTPServer((HOST, PORT), make_handler(engine))
+    print(f"📊 Query API on http://{HOST}:{PORT}/ ({', '.join(ENDPOINTS)}) — params: start, end, sport")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n⚠️ Shutting down.")
+    finally:
+        server.server_close()
@@ -0,0 +1,42 @@
+import os
+import sys
+import json
+import time
+import requests
+from dotenv import load_dotenv
+from ingest_server import HOST, PORT, sign
+
+# ---------------- CONFIG ---------------- #
+# One webhook event per line, e.g.
+# {"user_id": 22458861, "id": "bfd17e43-beae-4a4e-92aa-be2b8dcab887", "type": "workout.updated", "trace_id": "t-1"}
+EVENTS_FILE = sys.argv[1] if len(sys.argv) > 1 else "webhook_events.jsonl"
+WEBHOOK_URL = f"http://{HOST}:{PORT}/webhook"
+DELAY_SEC = float(os.getenv("WHOOP_REPLAY_DELAY", "0"))  # pause between events
+
+load_dotenv()
+CLIENT_SECRET = os.getenv("WHOOP_CLIENT_SECRET")
+
+if not os.path.exists(EVENTS_FILE):
+    raise FileNotFoundError(f"❌ {EVENTS_FILE} not found.")
+
+with open(EVENTS_FILE, "r") as f:
+    events = [json.loads(line) for line in f if line.strip()]
+
+print(f"🔁 Replaying {len(events)} events to {WEBHOOK_URL}...")
+sent = 0
+for event in events:
+    body = json.dumps(event).encode()
+    headers = {"Content-Type": "application/json"}
+    if CLIENT_SECRET:
+        timestamp = str(int(time.time() * 1000))
+        headers["X-WHOOP-Signature-Timestamp"] = timestamp
+        headers["X-WHOOP-Signature"] = sign(CLIENT_SECRET, timestamp, body)
+    resp = requests.post(WEBHOOK_URL, data=body, headers=headers)
+    if resp.status_code != 204:
+        print(f"⚠️ {event.get('type')} {event.get('id')}: HTTP {resp.status_code} {resp.text}")
+    else:
+        sent += 1
+    if DELAY_SEC:
+        time.sleep(DELAY_SEC)
+
+print(f"✅ Replayed {sent}/{len(events)} events")
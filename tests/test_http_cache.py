@@ -0,0 +1,119 @@
+import os
+import sys
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from http_cache import ResponseStore, RecordReplayAdapter, CacheMissError  # noqa: E402
+
+
+class PagedWorkouts(BaseHTTPRequestHandler):
+    """Two-page workout collection plus single workouts by id; counts how often it is hit."""
+
+    hits = 0
+    version = 1  # bumped by tests to simulate a workout being updated
+
+    def do_GET(self):
+        type(self).hits += 1
+        if "/activity/workout/" in self.path:
+            body = json.dumps({"id": self.path.rsplit("/", 1)[-1], "version": type(self).version}).encode()
+        else:
+            last_page = "next_token" in self.path
+            body = json.dumps({"records": [{"path": self.path}], "next_token": None if last_page else "page2"}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def api():
+    PagedWorkouts.hits = 0
+    PagedWorkouts.version = 1
+    server = ThreadingHTTPServer(("127.0.0.1", 0), PagedWorkouts)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server, f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def session_for(base_url, store, mode):
+    session = requests.Session()
+    session.mount(base_url, RecordReplayAdapter(store, mode))
+    return session
+
+
+def fetch_all(session, base_url):
+    """Follow next_token like 1000get_workouts.py; return (paths, X-Cache headers)."""
+    paths, cache_headers, next_token = [], [], None
+    while True:
+        params = {"start": "2024-12-13T00:00:00Z", "end": "2025-11-11T00:00:00Z"}
+        if next_token:
+            params["next_token"] = next_token
+        resp = session.get(f"{base_url}/developer/v2/activity/workout", params=params)
+        resp.raise_for_status()
+        data = resp.json()
+        paths.append(data["records"][0]["path"])
+        cache_headers.append(resp.headers.get("X-Cache"))
+        next_token = data.get("next_token")
+        if not next_token:
+            return paths, cache_headers
+
+
+def test_record_then_replay_pagination(api, tmp_path):
+    server, base_url = api
+    db = str(tmp_path / "http_cache.sqlite3")
+
+    recorded, cache_headers = fetch_all(session_for(base_url, ResponseStore(db), "record"), base_url)
+    assert cache_headers == [None, None]
+    assert PagedWorkouts.hits == 2
+
+    # Fresh entries are served from the store in record mode
+    again, cache_headers = fetch_all(session_for(base_url, ResponseStore(db), "record"), base_url)
+    assert again == recorded
+    assert cache_headers == ["HIT", "HIT"]
+    assert PagedWorkouts.hits == 2
+
+    # Replay works with the server gone and fails loudly on anything unrecorded
+    server.shutdown()
+    replay = session_for(base_url, ResponseStore(db), "replay")
+    replayed, cache_headers = fetch_all(replay, base_url)
+    assert replayed == recorded
+    assert cache_headers == ["HIT", "HIT"]
+    with pytest.raises(CacheMissError):
+        replay.get(f"{base_url}/developer/v2/activity/sleep")
+
+
+def test_single_record_by_id_is_never_cached(api, tmp_path):
+    _server, base_url = api
+    db = str(tmp_path / "http_cache.sqlite3")
+    session = session_for(base_url, ResponseStore(db), "record")
+    url = f"{base_url}/developer/v2/activity/workout/abc"
+
+    assert session.get(url).json()["version"] == 1
+    PagedWorkouts.version = 2  # workout.updated webhook arrives
+    resp = session.get(url)
+    assert resp.headers.get("X-Cache") is None
+    assert resp.json()["version"] == 2
+    assert PagedWorkouts.hits == 2
+
+    with pytest.raises(CacheMissError):
+        session_for(base_url, ResponseStore(db), "replay").get(url)
+
+
+def test_evicts_least_recently_used(tmp_path):
+    store = ResponseStore(str(tmp_path / "http_cache.sqlite3"), max_bytes=100)
+    store.put("a", "u", 200, {}, b"x" * 40)
+    store.put("b", "u", 200, {}, b"x" * 40)
+    store.get("a")  # "b" is now the least recently used
+    store.put("c", "u", 200, {}, b"x" * 40)
+    assert store.get("a") is not None
+    assert store.get("b") is None
+    assert store.get("c") is not None
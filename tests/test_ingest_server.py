@@ -0,0 +1,108 @@
+import os
+import sys
+import json
+import time
+import pytest
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import ingest_server  # noqa: E402
+from ingest_server import EventQueue, coalesce, process_batch, sign, verify_signature  # noqa: E402
+
+
+def http_error(status):
+    resp = requests.Response()
+    resp.status_code = status
+    return requests.HTTPError(f"HTTP {status}", response=resp)
+
+
+class FakeClient:
+    """Stands in for WhoopClient; records which ids were fetched."""
+
+    def __init__(self, errors=None):
+        self.errors = errors or {}
+        self.fetched = []
+
+    def get_workout(self, workout_id):
+        self.fetched.append(workout_id)
+        if workout_id in self.errors:
+            raise self.errors[workout_id]
+        return {"id": workout_id, "start": "2025-11-10T10:00:00Z", "sport_name": "running"}
+
+    def get_sleep(self, sleep_id):
+        return {"id": sleep_id, "cycle_id": 7}
+
+    def get_recovery_for_cycle(self, cycle_id):
+        return {"cycle_id": cycle_id, "sleep_id": "s1"}
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return EventQueue(str(tmp_path / "queue.sqlite3"))
+
+
+def stored_ids(data_dir):
+    with open(os.path.join(data_dir, "workouts.json")) as f:
+        return sorted(w["id"] for w in json.load(f))
+
+
+def event_row(queue, record_id):
+    return queue._conn.execute(
+        "SELECT attempts, next_attempt_at FROM events WHERE record_id = ?", (record_id,)
+    ).fetchone()
+
+
+def test_coalesce_keeps_newest_event_per_record():
+    rows = [
+        (1, "workout.updated", "a", 0),
+        (2, "workout.updated", "a", 0),
+        (3, "workout.deleted", "a", 0),
+        (4, "sleep.updated", "a", 0),
+    ]
+    assert coalesce(rows) == {("workout", "a"): ("deleted", [1, 2, 3]), ("sleep", "a"): ("updated", [4])}
+
+
+def test_batch_upserts_once_and_deletes(queue, tmp_path):
+    data_dir = str(tmp_path)
+    with open(os.path.join(data_dir, "workouts.json"), "w") as f:
+        json.dump([{"id": "old", "start": "2025-01-01T00:00:00Z"}, {"id": "gone", "start": "2025-01-02T00:00:00Z"}], f)
+    for record_id in ["new", "new", "new"]:
+        queue.put({"type": "workout.updated", "id": record_id})
+    queue.put({"type": "workout.deleted", "id": "old"})
+    queue.put({"type": "workout.updated", "id": "gone"})
+
+    client = FakeClient(errors={"gone": http_error(404)})
+    assert process_batch(client, queue, data_dir) == 5
+    assert client.fetched.count("new") == 1
+    assert stored_ids(data_dir) == ["new"]  # "old" deleted, 404 on "gone" treated as delete
+    assert queue.pending() == 0
+
+
+def test_request_exception_backs_off_then_dead_letters(queue, tmp_path, monkeypatch):
+    monkeypatch.setattr(ingest_server, "MAX_ATTEMPTS", 2)
+    client = FakeClient(errors={"flaky": requests.ConnectionError("down")})
+    queue.put({"type": "workout.updated", "id": "flaky"})
+
+    process_batch(client, queue, str(tmp_path))
+    attempts, next_attempt_at = event_row(queue, "flaky")
+    assert attempts == 1
+    assert next_attempt_at > time.time()
+    assert queue.take() == []  # not due yet
+
+    queue._conn.execute("UPDATE events SET next_attempt_at = 0")
+    process_batch(client, queue, str(tmp_path))
+    assert queue.pending() == 0
+    assert queue._conn.execute("SELECT record_id, attempts FROM dead_letters").fetchall() == [("flaky", 2)]
+
+
+def test_signature_check():
+    body = b'{"id": "a", "type": "workout.updated"}'
+    now = time.time()
+    timestamp = str(int(now * 1000))
+    signature = sign("secret", timestamp, body)
+
+    assert verify_signature("secret", timestamp, body, signature, now=now)
+    assert not verify_signature("other", timestamp, body, signature, now=now)
+    assert not verify_signature("secret", timestamp, body + b" ", signature, now=now)
+    assert not verify_signature(None, timestamp, body, signature, now=now)
+    assert not verify_signature("secret", timestamp, body, signature, now=now + ingest_server.SIGNATURE_MAX_AGE_SEC + 1)
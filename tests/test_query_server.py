@@ -0,0 +1,116 @@
+import os
+import sys
+import json
+import threading
+import urllib.request
+from urllib.error import HTTPError
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from query_server import QueryEngine, ThreadingHTTPServer, make_handler  # noqa: E402
+
+
+def workout(workout_id, start, sport_name="running", strain=10.0, kilojoule=418.4):
+    return {
+        "id": workout_id,
+        "start": start,
+        "sport_name": sport_name,
+        "score": {
+            "strain": strain,
+            "average_heart_rate": 120,
+            "max_heart_rate": 160,
+            "kilojoule": kilojoule,
+            "zone_durations": {"zone_zero_milli": 1000, "zone_one_milli": None},
+        },
+    }
+
+
+def write_workouts(path, workouts):
+    with open(path, "w") as f:
+        json.dump(workouts, f)
+
+
+def bump_mtime(path):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+@pytest.fixture
+def data_file(tmp_path):
+    path = str(tmp_path / "workouts.json")
+    write_workouts(path, [
+        workout("a", "2025-11-10T10:00:00Z"),
+        workout("a", "2025-11-10T10:00:00Z"),  # duplicate page from a paginated fetch
+        workout("b", "2025-11-11T10:00:00Z", sport_name="walking", strain=4.0),
+    ])
+    return path
+
+
+@pytest.fixture
+def server(data_file):
+    engine = QueryEngine(data_file)
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(engine))
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield engine, f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def get(url, etag=None):
+    request = urllib.request.Request(url, headers={"If-None-Match": etag} if etag else {})
+    try:
+        with urllib.request.urlopen(request) as resp:
+            return resp.status, resp.headers.get("ETag"), json.loads(resp.read())
+    except HTTPError as e:
+        body = e.read()
+        return e.code, e.headers.get("ETag"), json.loads(body) if body else None
+
+
+def test_aggregates_and_filters(data_file):
+    engine = QueryEngine(data_file)
+    summary = json.loads(engine.query("summary")[0])["summary"]
+    assert summary["total_workouts"] == 2  # duplicates counted once
+    assert summary["avg_strain"] == 7.0
+    assert summary["total_kcal"] == 200.0
+
+    walking = json.loads(engine.query("sports", start="2025-11-11", sport="walking")[0])
+    assert walking["sports"] == {"walking": 1}
+    zones = json.loads(engine.query("zones", end="2025-11-10")[0])["zones"]
+    assert zones["Z0"] == 1000.0
+    assert zones["Z1"] is None  # only nulls in range
+
+
+def test_rewrite_invalidates_cache_and_etag(data_file):
+    engine = QueryEngine(data_file)
+    body, etag = engine.query("summary")
+    assert engine.query("summary") == (body, etag)
+    assert engine._cached.cache_info().hits == 1
+
+    write_workouts(data_file, [workout("c", "2025-11-12T10:00:00Z", strain=20.0)])
+    bump_mtime(data_file)
+
+    new_body, new_etag = engine.query("summary")
+    assert json.loads(new_body)["summary"]["total_workouts"] == 1
+    assert new_etag != etag
+    assert engine._cached.cache_info().currsize == 1  # old entries were cleared
+
+
+def test_etag_304_and_bad_start(server):
+    _engine, base = server
+    status, etag, body = get(f"{base}/weekly")
+    assert status == 200
+    assert body["weekly"][0]["week"] == "2025-11-10"
+
+    assert get(f"{base}/weekly", etag)[0] == 304
+    assert get(f"{base}/weekly?start=not-a-date")[0] == 400
+    assert get(f"{base}/nope")[0] == 404
+
+
+def test_empty_file(server, data_file):
+    _engine, base = server
+    write_workouts(data_file, [])
+    bump_mtime(data_file)
+    for endpoint in ["summary", "weekly", "sports", "weekday", "zones"]:
+        status, _etag, body = get(f"{base}/{endpoint}")
+        assert status == 200, endpoint
+    assert body["zones"]["Z0"] is None
@@ -0,0 +1,63 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from zone_store import (  # noqa: E402
+    ZONE_KEYS,
+    build_zone_store,
+    load_zone_store,
+    zone_arrays,
+    zone_distribution_by_period,
+    zone_distribution_by_sport,
+    zone_means,
+)
+
+
+def workout(start, sport_name, zones, sport_id=1):
+    return {
+        "id": f"{sport_name}-{start}",
+        "start": start,
+        "sport_id": sport_id,
+        "sport_name": sport_name,
+        "score": {"zone_durations": dict(zip(ZONE_KEYS, zones))},
+    }
+
+
+WORKOUTS = [
+    workout("2025-11-09T23:30:00Z", "running", [100, 200, 300, 400, 500, 600]),   # Sunday
+    workout("2025-11-10T00:30:00Z", "running", [300, None, 100, 0, 0, 0]),        # Monday
+    workout("2025-11-11T10:00:00Z", "walking", [1000, 2000, 0, 0, 0, 0], sport_id=None),
+    workout("2025-11-12T10:00:00Z", "cycling", [50, 60, 70, 80, 90, 100], sport_id=None),
+]
+
+
+def test_null_zone_is_skipped_not_zero():
+    store = zone_arrays(WORKOUTS[:2])
+    means = zone_means(store)
+    assert means[0] == 200
+    assert means[1] == 200  # only the non-null value counts
+    assert not store.valid[1, 1]
+
+
+def test_per_sport_means_match_pandas(tmp_path):
+    build_zone_store(WORKOUTS, str(tmp_path))
+    store = load_zone_store(str(tmp_path))
+    assert isinstance(store.zones, np.memmap)
+
+    by_sport = zone_distribution_by_sport(store)
+
+    df = pd.json_normalize(WORKOUTS)
+    zone_cols = [f"score.zone_durations.{z}" for z in ZONE_KEYS]
+    expected = df.groupby("sport_name")[zone_cols].mean()
+    assert sorted(by_sport) == sorted(expected.index)  # missing sport_id doesn't merge sports
+    for sport, row in expected.iterrows():
+        np.testing.assert_allclose(by_sport[sport], row.to_numpy(dtype=float))
+
+
+def test_weeks_start_on_monday():
+    periods, means, counts = zone_distribution_by_period(zone_arrays(WORKOUTS), "W")
+    assert [str(p) for p in periods] == ["2025-11-03", "2025-11-10"]
+    assert counts.tolist() == [1, 3]
+    assert means[0, 0] == 100
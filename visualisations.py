@@ -3,12 +3,20 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
 import os
+from zone_store import load_zone_store, zone_distribution_by_sport, ZONE_LABELS, STORE_DIR, ZONES_FILE
 
 # ==========================================
 # 1️⃣ Load data
 # ==========================================
 CSV_FILE = "workouts_analysis.csv"
 
+# "dense": NumPy calendar grid drawn with imshow (one row per ISO year) and
+#          hexbin density scatter — render cost does not grow with workout count.
+# "classic": seaborn heatmap and per-workout bubble scatter.
+RENDER_MODE = os.getenv("WHOOP_RENDER_MODE", "dense")
+HEXBIN_GRIDSIZE = 40
+WEEKDAY_LABELS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
 if not os.path.exists(CSV_FILE):
     raise FileNotFoundError(f"❌ {CSV_FILE} not found. Please run statistics.py first.")
 
@@ -23,40 +31,76 @@ df["start"] = pd.to_datetime(df["start"], errors="coerce")
 df["date"] = df["start"].dt.date
 workouts_per_day = df.groupby("date").size().reset_index(name="count")
 
-# Pivot for calendar heatmap
-workouts_per_day["weekday"] = pd.to_datetime(workouts_per_day["date"]).dt.weekday
-workouts_per_day["week"] = pd.to_datetime(workouts_per_day["date"]).dt.isocalendar().week
-
-# ✅ Corrected pivot syntax
-heatmap_data = workouts_per_day.pivot(index="weekday", columns="week", values="count")
-
-plt.figure(figsize=(14, 4))
-sns.heatmap(heatmap_data, cmap="YlGnBu", cbar=False, linewidths=0.3)
-plt.title("Workout Frequency by Day (Heatmap Calendar)", fontsize=14)
-plt.yticks(
-    ticks=np.arange(7) + 0.5,
-    labels=["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"],
-    rotation=0,
-)
-plt.xlabel("Week Number")
-plt.ylabel("")
-plt.tight_layout()
-plt.savefig("workout_heatmap_calendar.png", dpi=300)
-plt.close()
+# ISO year/week/weekday so late-December and early-January weeks don't collide
+iso = pd.to_datetime(workouts_per_day["date"]).dt.isocalendar()
+workouts_per_day["year"] = iso["year"].astype(int)
+workouts_per_day["week"] = iso["week"].astype(int)
+workouts_per_day["weekday"] = iso["day"].astype(int) - 1
+
+if RENDER_MODE == "dense" and not workouts_per_day.empty:
+    # Dense (year, weekday, week) grid filled with a single bincount
+    years = np.arange(workouts_per_day["year"].min(), workouts_per_day["year"].max() + 1)
+    flat_idx = (
+        (workouts_per_day["year"].to_numpy() - years[0]) * 7 * 53
+        + workouts_per_day["weekday"].to_numpy() * 53
+        + workouts_per_day["week"].to_numpy() - 1
+    )
+    grid = np.bincount(
+        flat_idx, weights=workouts_per_day["count"].to_numpy(), minlength=len(years) * 7 * 53
+    ).reshape(len(years), 7, 53)
+    vmax = max(grid.max(), 1)
+
+    fig, axes = plt.subplots(len(years), 1, figsize=(14, 2.2 * len(years)), squeeze=False)
+    for ax, year, year_grid in zip(axes[:, 0], years, grid):
+        ax.imshow(year_grid, cmap="YlGnBu", vmin=0, vmax=vmax, aspect="equal", interpolation="nearest")
+        ax.set_title(str(year), fontsize=11, loc="left")
+        ax.set_yticks(np.arange(7))
+        ax.set_yticklabels(WEEKDAY_LABELS)
+        ax.set_xticks(np.arange(0, 53, 4))
+        ax.set_xticklabels(np.arange(1, 54, 4))
+    axes[-1, 0].set_xlabel("Week Number")
+    fig.suptitle("Workout Frequency by Day (Heatmap Calendar)", fontsize=14)
+    fig.tight_layout()
+    fig.savefig("workout_heatmap_calendar.png", dpi=150)
+    plt.close(fig)
+else:
+    workouts_per_day["year_week"] = (
+        workouts_per_day["year"].astype(str) + "-W" + workouts_per_day["week"].astype(str).str.zfill(2)
+    )
+    heatmap_data = workouts_per_day.pivot(index="weekday", columns="year_week", values="count")
+
+    plt.figure(figsize=(14, 4))
+    sns.heatmap(heatmap_data, cmap="YlGnBu", cbar=False, linewidths=0.3)
+    plt.title("Workout Frequency by Day (Heatmap Calendar)", fontsize=14)
+    plt.yticks(
+        ticks=np.arange(7) + 0.5,
+        labels=WEEKDAY_LABELS,
+        rotation=0,
+    )
+    plt.xlabel("Week")
+    plt.ylabel("")
+    plt.tight_layout()
+    plt.savefig("workout_heatmap_calendar.png", dpi=300)
+    plt.close()
 print("📈 Saved workout_heatmap_calendar.png")
 
 # ==========================================
 # 3️⃣ Radar Chart (avg HR zones per sport)
 # ==========================================
-zone_cols = [c for c in df.columns if "score_zone" in c]
+if os.path.exists(os.path.join(STORE_DIR, ZONES_FILE)):
+    # Grouped reduction over the memory-mapped zone store (built by workout_statistics.py)
+    by_sport = zone_distribution_by_sport(load_zone_store(STORE_DIR))
+    zone_means = pd.DataFrame(by_sport, index=ZONE_LABELS).T.rename_axis("sport_name").reset_index()
+else:
+    zone_cols = [c for c in df.columns if "score_zone" in c]
+    zone_means = df.groupby("sport_name")[zone_cols].mean().reset_index() if zone_cols else None
 
-if zone_cols:
-    zone_means = df.groupby("sport_name")[zone_cols].mean().reset_index()
+if zone_means is not None and not zone_means.empty:
     sport_names = zone_means["sport_name"].values
-    zones = [z.replace("score_zone_", "Z") for z in zone_cols]
+    zones = [z.replace("score_zone_", "Z") for z in zone_means.columns[1:]]
 
     plt.figure(figsize=(7, 7))
-    angles = np.linspace(0, 2 * np.pi, len(zone_cols), endpoint=False).tolist()
+    angles = np.linspace(0, 2 * np.pi, len(zones), endpoint=False).tolist()
     angles += angles[:1]  # close the circle
 
     for i, sport in enumerate(sport_names):
@@ -75,7 +119,7 @@ else:
     print("⚠️ No HR zone columns found — skipping radar chart.")
 
 # ==========================================
-# 4️⃣ Bubble Chart (strain vs kcal vs duration)
+# 4️⃣ Density / Bubble Chart (strain vs kcal vs duration)
 # ==========================================
 possible_duration_cols = [
     "duration", "score_duration", "duration_sec", "workout_duration", "score_workout_duration"
@@ -85,7 +129,30 @@ duration_col = next((c for c in possible_duration_cols if c in df.columns), None
 strain_col = "strain" if "strain" in df.columns else "score_strain"
 energy_col = "energy_kcal" if "energy_kcal" in df.columns else None
 
-if not all([strain_col in df.columns, energy_col in df.columns, duration_col]):
+if RENDER_MODE == "dense":
+    if strain_col not in df.columns or energy_col not in df.columns:
+        print("⚠️ Missing columns for density chart — skipping.")
+    else:
+        # Fixed-size hexagonal bins: cost and file size stay constant however many workouts there are
+        points = df[[strain_col, energy_col]].apply(pd.to_numeric, errors="coerce").dropna()
+        plt.figure(figsize=(8, 6))
+        plt.hexbin(
+            points[strain_col],
+            points[energy_col],
+            gridsize=HEXBIN_GRIDSIZE,
+            cmap="YlGnBu",
+            mincnt=1,
+            bins="log",
+        )
+        plt.colorbar(label="Workouts (log scale)")
+        plt.title("Workout Density — Strain vs Energy", fontsize=14)
+        plt.xlabel("Strain")
+        plt.ylabel("Energy (kcal)")
+        plt.tight_layout()
+        plt.savefig("density_chart_strain_energy.png", dpi=150)
+        plt.close()
+        print("📈 Saved density_chart_strain_energy.png")
+elif not all([strain_col in df.columns, energy_col in df.columns, duration_col]):
     print("⚠️ Missing columns for bubble chart — skipping.")
 else:
     df[duration_col] = pd.to_numeric(df[duration_col], errors="coerce") / 60  # convert seconds → minutes
@@ -95,8 +162,10 @@ else:
         df[energy_col],
         s=df[duration_col],
         alpha=0.5,
-        c=np.random.rand(len(df)),
+        c=df[duration_col],
+        cmap="viridis",
     )
+    plt.colorbar(label="Duration (min)")
     plt.title("Workout Bubble Chart — Strain vs Energy vs Duration", fontsize=14)
     plt.xlabel("Strain")
     plt.ylabel("Energy (kcal)")
@@ -2,15 +2,32 @@ import os
 import json
 import secrets
 import string
+from datetime import datetime, timedelta, timezone
 from authlib.integrations.requests_client import OAuth2Session
+from http_cache import ResponseStore, RecordReplayAdapter, HTTP_CACHE_DB
 
 AUTH_URL = "https://api.prod.whoop.com/oauth/oauth2/auth"
 TOKEN_URL = "https://api.prod.whoop.com/oauth/oauth2/token"
 API_BASE_URL = "https://api.prod.whoop.com/developer/v2"
 
 
+def default_end_date():
+    """End of the fetch window for the get_workouts scripts.
+
+    WHOOP_END_DATE wins if set. With the HTTP cache on, the end is the next UTC
+    midnight, so reruns on the same day send identical params and hit recorded
+    responses. Otherwise the end is now, as before.
+    """
+    if os.getenv("WHOOP_END_DATE"):
+        return os.getenv("WHOOP_END_DATE")
+    now = datetime.now(timezone.utc)
+    if os.getenv("WHOOP_HTTP_CACHE", "off") != "off":
+        return (now.date() + timedelta(days=1)).isoformat() + "T00:00:00Z"
+    return now.replace(tzinfo=None).isoformat() + "Z"
+
+
 class WhoopClient:
-    def __init__(self, client_id, client_secret, redirect_uri, scope=None):
+    def __init__(self, client_id, client_secret, redirect_uri, scope=None, cache_mode=None, cache_path=HTTP_CACHE_DB):
         self.client_id = client_id
         self.client_secret = client_secret
         self.redirect_uri = redirect_uri
@@ -21,15 +38,28 @@ class WhoopClient:
             secrets.choice(string.ascii_letters + string.digits) for _ in range(64)
         )
 
-        # OAuth2 session
+        # OAuth2 session (refreshes expired tokens and saves them to token.json)
         self.session = OAuth2Session(
             client_id=self.client_id,
+            client_secret=self.client_secret,
+            token_endpoint_auth_method="client_secret_post",
+            token_endpoint=TOKEN_URL,
+            update_token=self._save_token,
             redirect_uri=self.redirect_uri,
             scope=self.scope,
             code_challenge_method="S256",
             code_verifier=self.code_verifier,
         )
 
+        # Record/replay HTTP cache for API calls ("off", "record" or "replay")
+        self.cache_mode = cache_mode or os.getenv("WHOOP_HTTP_CACHE", "off")
+        if self.cache_mode != "off":
+            self.cache = ResponseStore(cache_path)
+            self.session.mount(API_BASE_URL, RecordReplayAdapter(self.cache, self.cache_mode))
+        if self.cache_mode == "replay":
+            # Offline replay needs no real credentials; recorded responses ignore the token
+            self.session.token = {"access_token": "replay", "token_type": "bearer"}
+
     def create_authorization_url(self):
         uri, state = self.session.create_authorization_url(AUTH_URL)
         return uri, state
@@ -38,15 +68,19 @@ class WhoopClient:
         token = self.session.fetch_token(
             url=TOKEN_URL,
             authorization_response=authorization_response,
-            client_secret=self.client_secret,
             code_verifier=self.code_verifier,
         )
-        with open("token.json", "w") as f:
-            json.dump(token, f, indent=2)
+        self._save_token(token)
         print("✅ Access token saved to token.json")
         return token
 
+    def _save_token(self, token, refresh_token=None, access_token=None):
+        with open("token.json", "w") as f:
+            json.dump(dict(token), f, indent=2)
+
     def load_token(self):
+        if self.cache_mode == "replay":
+            return self.session.token
         if os.path.exists("token.json"):
             with open("token.json", "r") as f:
                 token = json.load(f)
@@ -99,4 +133,22 @@ class WhoopClient:
             params["end"] = end
         resp = self.session.get(url, params=params)
         resp.raise_for_status()
-        return resp.json()
\ No newline at end of file
+        return resp.json()
+
+    def get_workout(self, workout_id):
+        """Get a single workout by id."""
+        resp = self.session.get(f"{API_BASE_URL}/activity/workout/{workout_id}")
+        resp.raise_for_status()
+        return resp.json()
+
+    def get_sleep(self, sleep_id):
+        """Get a single sleep by id."""
+        resp = self.session.get(f"{API_BASE_URL}/activity/sleep/{sleep_id}")
+        resp.raise_for_status()
+        return resp.json()
+
+    def get_recovery_for_cycle(self, cycle_id):
+        """Get the recovery belonging to a physiological cycle."""
+        resp = self.session.get(f"{API_BASE_URL}/cycle/{cycle_id}/recovery")
+        resp.raise_for_status()
+        return resp.json()
@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+
+# Shared by workout_statistics.py (reports) and query_server.py (dashboard API),
+# so both answer with the same numbers from the same formulas.
+
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+SUM_COLS = ["strain_sum", "strain_n", "hr_sum", "hr_n", "kcal_sum"]
+
+
+def build_daily_rollup(workouts):
+    """One row per (UTC date, sport): counts and sums every aggregate is answered from.
+
+    Expects de-duplicated records (see local_store.unique_records).
+    """
+    if not workouts:
+        empty = pd.DataFrame(columns=["sport_name", "count", "max_hr"] + SUM_COLS)
+        empty.insert(0, "date", pd.Series(dtype="datetime64[ns]"))
+        return empty
+
+    df = pd.DataFrame(workouts)
+    score_df = pd.json_normalize(df["score"].apply(lambda s: s or {}).tolist())
+    score_df = score_df.reindex(columns=["strain", "average_heart_rate", "max_heart_rate", "kilojoule"])
+    score_df = score_df.apply(pd.to_numeric, errors="coerce")
+    score_df.index = df.index
+
+    out = pd.DataFrame(index=df.index)
+    out["date"] = pd.to_datetime(df["start"], utc=True).dt.tz_localize(None).dt.normalize()
+    out["sport_name"] = df["sport_name"].fillna("unknown")
+    out["strain_sum"], out["strain_n"] = score_df["strain"].fillna(0), score_df["strain"].notna()
+    out["hr_sum"], out["hr_n"] = score_df["average_heart_rate"].fillna(0), score_df["average_heart_rate"].notna()
+    out["max_hr"] = score_df["max_heart_rate"]
+    out["kcal_sum"] = score_df["kilojoule"].fillna(0) / 4.184  # kJ → kcal
+
+    rollup = out.groupby(["date", "sport_name"]).agg(
+        count=("sport_name", "size"),
+        max_hr=("max_hr", "max"),
+        **{c: (c, "sum") for c in SUM_COLS},
+    )
+    return rollup.reset_index().sort_values("date", ignore_index=True)
+
+
+def filter_rollup(rows, start=None, end=None, sport=None):
+    """Rows with start <= date <= end (YYYY-MM-DD, inclusive) and the given sport."""
+    mask = np.ones(len(rows), dtype=bool)
+    if start:
+        mask &= (rows["date"] >= pd.Timestamp(start)).to_numpy()
+    if end:
+        mask &= (rows["date"] <= pd.Timestamp(end)).to_numpy()
+    if sport:
+        mask &= (rows["sport_name"] == sport).to_numpy()
+    return rows[mask]
+
+
+def _ratio(num, den):
+    return round(float(num) / float(den), 2) if den else None
+
+
+def summary_stats(rows):
+    totals = rows[["count"] + SUM_COLS].sum()
+    return {
+        "total_workouts": int(totals["count"]),
+        "avg_strain": _ratio(totals["strain_sum"], totals["strain_n"]),
+        "avg_hr": _ratio(totals["hr_sum"], totals["hr_n"]),
+        "max_hr_overall": int(rows["max_hr"].max()) if rows["max_hr"].notna().any() else None,
+        "total_kcal": round(float(totals["kcal_sum"]), 2),
+    }
+
+
+def weekly_trends(rows):
+    """Per Monday-starting week: workouts, average strain and total kcal."""
+    weeks = rows["date"] - pd.to_timedelta(rows["date"].dt.weekday, unit="D")
+    weekly = rows.groupby(weeks)[["count", "strain_sum", "strain_n", "kcal_sum"]].sum()
+    return [
+        {
+            "week": week.date().isoformat(),
+            "workouts": int(w["count"]),
+            "avg_strain": _ratio(w["strain_sum"], w["strain_n"]),
+            "total_calories": round(float(w["kcal_sum"]), 2),
+        }
+        for week, w in weekly.iterrows()
+    ]
+
+
+def sport_frequency(rows):
+    freq = rows.groupby("sport_name")["count"].sum().sort_values(ascending=False, kind="stable")
+    return {str(k): int(v) for k, v in freq.items()}
+
+
+def weekday_profile(rows):
+    counts = np.bincount(rows["date"].dt.weekday.to_numpy(), weights=rows["count"].to_numpy(), minlength=7)
+    return {day: int(n) for day, n in zip(WEEKDAYS, counts)}
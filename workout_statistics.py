@@ -2,16 +2,20 @@ import json
 import pandas as pd
 import matplotlib.pyplot as plt
 from datetime import datetime
+from local_store import load_workouts
+from workout_rollups import build_daily_rollup, summary_stats as rollup_summary, weekly_trends, sport_frequency
+from zone_store import build_zone_store, load_zone_store, zone_means, ZONE_KEYS
 
 # ---------------- CONFIG ---------------- #
 INPUT_JSON = "workouts.json"
 OUTPUT_CSV = "workouts_analysis.csv"
 OUTPUT_SUMMARY_JSON = "workout_analysis_summary.json"
 OUTPUT_SUMMARY_XLSX = "workout_analysis_summary.xlsx"
+ZONE_STORE_DIR = "zone_store"
 
 # ---------------- LOAD DATA ---------------- #
-with open(INPUT_JSON, "r") as f:
-    workouts = json.load(f)
+# One copy per workout id — the same rule query_server.py uses
+workouts = load_workouts(INPUT_JSON)
 
 if not workouts:
     print("❌ No workouts found in JSON file.")
@@ -46,31 +50,32 @@ else:
 # ---------------- WEEK COLUMN ---------------- #
 df["week"] = df["start"].dt.to_period("W").apply(lambda r: r.start_time.date())
 
+# ---------------- DAILY ROLLUP ---------------- #
+# Summary, weekly and per-sport numbers come from the same rollup formulas
+# as the query API (workout_rollups.py), so reports and dashboards agree.
+rollup = build_daily_rollup(workouts)
+
 # ---------------- SUMMARY STATS ---------------- #
-summary_stats = {
-    "total_workouts": len(df),
-    "avg_strain": round(df["score_strain"].mean(), 2),
-    "avg_hr": round(df["score_average_heart_rate"].mean(), 2),
-    "max_hr_overall": int(df["score_max_heart_rate"].max()),
-    "total_kcal": round(df["energy_kcal"].sum(), 2),
-}
+summary_stats = rollup_summary(rollup)
 
 print("\n📊 SUMMARY STATS")
 for k, v in summary_stats.items():
     print(f"{k:20}: {v:.2f}" if isinstance(v, float) else f"{k:20}: {v}")
 
 # ---------------- WEEKLY AGGREGATES ---------------- #
-weekly = df.groupby("week").agg(
-    avg_strain=("score_strain", "mean"),
-    total_calories=("energy_kcal", "sum")
-).reset_index()
+weekly = pd.DataFrame(weekly_trends(rollup), columns=["week", "workouts", "avg_strain", "total_calories"])
+weekly["week"] = pd.to_datetime(weekly["week"]).dt.date
 
 # ---------------- TRAINING FREQUENCY BY SPORT ---------------- #
-sport_freq = df["sport_name"].value_counts().sort_values(ascending=False)
+sport_freq = pd.Series(sport_frequency(rollup), name="sessions", dtype=int).rename_axis("sport")
 
 # ---------------- HR ZONE DISTRIBUTION ---------------- #
-zone_cols = [c for c in df.columns if "zone_durations" in c]
-hr_zone_means = df[zone_cols].mean()
+# Zone durations go to a compact memory-mapped store (see zone_store.py)
+# so later charts can reuse them without re-reading the JSON/CSV.
+build_zone_store(workouts, ZONE_STORE_DIR)
+zone_store = load_zone_store(ZONE_STORE_DIR)
+hr_zone_means = pd.Series(zone_means(zone_store), index=ZONE_KEYS) if len(zone_store) else pd.Series(dtype=float)
+print(f"💾 Saved HR zone store ({len(zone_store)} workouts) to {ZONE_STORE_DIR}/")
 
 # ---------------- SAVE CSV ---------------- #
 df.to_csv(OUTPUT_CSV, index=False)
@@ -151,7 +156,7 @@ print(f"💾 Saved summary JSON to {OUTPUT_SUMMARY_JSON}")
 # Save Excel
 with pd.ExcelWriter(OUTPUT_SUMMARY_XLSX) as writer:
     pd.DataFrame([summary_stats]).to_excel(writer, sheet_name="Summary Stats", index=False)
-    sport_freq.reset_index().rename(columns={"index": "sport", "sport_name": "sessions"}).to_excel(writer, sheet_name="By Sport", index=False)
+    sport_freq.reset_index().to_excel(writer, sheet_name="By Sport", index=False)
     weekly.to_excel(writer, sheet_name="Weekly Trends", index=False)
 print(f"💾 Saved Excel summary to {OUTPUT_SUMMARY_XLSX}")
 
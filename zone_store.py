@@ -0,0 +1,163 @@
+import os
+import json
+from datetime import datetime
+import numpy as np
+from local_store import load_workouts
+
+# ---------------- CONFIG ---------------- #
+INPUT_JSON = "workouts.json"
+STORE_DIR = "zone_store"
+
+ZONE_KEYS = [
+    "zone_zero_milli",
+    "zone_one_milli",
+    "zone_two_milli",
+    "zone_three_milli",
+    "zone_four_milli",
+    "zone_five_milli",
+]
+ZONE_LABELS = ["Z0", "Z1", "Z2", "Z3", "Z4", "Z5"]
+
+ZONES_FILE = "zones.npy"      # N x 6 int32, milliseconds per zone (0 where missing)
+VALID_FILE = "zone_valid.npy"  # N x 6 bool, False where the API reported null
+SPORTS_FILE = "sport_codes.npy"  # N int32, index into sport_names.json
+STARTS_FILE = "starts.npy"    # N int64, workout start (epoch seconds, UTC)
+SPORT_NAMES_FILE = "sport_names.json"  # sorted list of sport names
+
+# 1970-01-01 was a Thursday; shift so that weeks start on Monday
+_EPOCH_MONDAY_OFFSET = 3 * 86400
+_WEEK_SECONDS = 7 * 86400
+
+
+class ZoneStore:
+    """HR-zone durations as parallel, memory-mapped NumPy arrays."""
+
+    def __init__(self, zones, valid, sport_codes, starts, sport_names):
+        self.zones = zones
+        self.valid = valid
+        self.sport_codes = sport_codes
+        self.starts = starts
+        self.sport_names = sport_names
+
+    def __len__(self):
+        return len(self.starts)
+
+    def sport_code(self, sport_name):
+        """Code for `sport_name`, or -1 if no stored workout has that sport."""
+        return self.sport_names.index(sport_name) if sport_name in self.sport_names else -1
+
+
+def _records(workouts):
+    """Accept both a plain list and the API's {"records": [...]} payload."""
+    if isinstance(workouts, dict):
+        return workouts.get("records", [])
+    return workouts
+
+
+def _sport_name(workout):
+    """Group key for a workout's sport — the same one the pandas charts group by."""
+    if workout.get("sport_name"):
+        return workout["sport_name"]
+    if workout.get("sport_id") is not None:
+        return f"Unknown ({workout['sport_id']})"
+    return "unknown"
+
+
+def zone_arrays(workouts):
+    """Build an in-memory ZoneStore from workout records."""
+    records = [wo for wo in _records(workouts) if (wo.get("score") or {}).get("zone_durations")]
+
+    zones = np.zeros((len(records), len(ZONE_KEYS)), dtype=np.int32)
+    valid = np.zeros((len(records), len(ZONE_KEYS)), dtype=bool)
+    starts = np.empty(len(records), dtype=np.int64)
+
+    for i, wo in enumerate(records):
+        durations = wo["score"]["zone_durations"]
+        values = [durations.get(k) for k in ZONE_KEYS]
+        valid[i] = [v is not None for v in values]
+        zones[i] = [v or 0 for v in values]
+        starts[i] = int(datetime.fromisoformat(wo["start"].replace("Z", "+00:00")).timestamp())
+
+    names = np.array([_sport_name(wo) for wo in records], dtype=str)
+    sport_names, sport_codes = np.unique(names, return_inverse=True)
+    return ZoneStore(zones, valid, sport_codes.astype(np.int32), starts, sport_names.tolist())
+
+
+def build_zone_store(workouts, store_dir=STORE_DIR):
+    """Write zone durations, sport codes and start times to `store_dir`."""
+    store = zone_arrays(workouts)
+
+    os.makedirs(store_dir, exist_ok=True)
+    np.save(os.path.join(store_dir, ZONES_FILE), store.zones)
+    np.save(os.path.join(store_dir, VALID_FILE), store.valid)
+    np.save(os.path.join(store_dir, SPORTS_FILE), store.sport_codes)
+    np.save(os.path.join(store_dir, STARTS_FILE), store.starts)
+    with open(os.path.join(store_dir, SPORT_NAMES_FILE), "w") as f:
+        json.dump(store.sport_names, f, indent=2)
+
+    return len(store)
+
+
+def load_zone_store(store_dir=STORE_DIR):
+    """Memory-map a store written by build_zone_store (no data is copied)."""
+    zones = np.load(os.path.join(store_dir, ZONES_FILE), mmap_mode="r")
+    valid = np.load(os.path.join(store_dir, VALID_FILE), mmap_mode="r")
+    sport_codes = np.load(os.path.join(store_dir, SPORTS_FILE), mmap_mode="r")
+    starts = np.load(os.path.join(store_dir, STARTS_FILE), mmap_mode="r")
+    with open(os.path.join(store_dir, SPORT_NAMES_FILE), "r") as f:
+        sport_names = json.load(f)
+    return ZoneStore(zones, valid, sport_codes, starts, sport_names)
+
+
+def _safe_mean(sums, counts):
+    """sums / counts, NaN where a zone has no valid values (like pandas' mean)."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, sums / counts, np.nan)
+
+
+def _grouped_means(zones, valid, keys):
+    """Mean of each zone column per unique key, skipping nulls, via bincount reductions."""
+    groups, inverse = np.unique(keys, return_inverse=True)
+    counts = np.bincount(inverse, minlength=len(groups))
+    sums = np.empty((len(groups), zones.shape[1]), dtype=np.float64)
+    valid_counts = np.empty((len(groups), zones.shape[1]), dtype=np.int64)
+    for z in range(zones.shape[1]):
+        sums[:, z] = np.bincount(inverse, weights=zones[:, z], minlength=len(groups))
+        valid_counts[:, z] = np.bincount(inverse, weights=valid[:, z], minlength=len(groups))
+    return groups, _safe_mean(sums, valid_counts), counts
+
+
+def zone_means(store, mask=None):
+    """Average milliseconds per zone over all (or masked) workouts, skipping nulls."""
+    zones = store.zones if mask is None else store.zones[mask]
+    valid = store.valid if mask is None else store.valid[mask]
+    return _safe_mean(zones.sum(axis=0, dtype=np.float64), valid.sum(axis=0))
+
+
+def zone_distribution_by_sport(store):
+    """Return {sport_name: array of 6 mean zone durations (ms)}."""
+    groups, means, _ = _grouped_means(store.zones, store.valid, store.sport_codes)
+    return {store.sport_names[g]: means[i] for i, g in enumerate(groups)}
+
+
+def period_keys(starts, period="W"):
+    """Map epoch seconds to period start dates ("D", "W" or "M")."""
+    starts = np.asarray(starts, dtype=np.int64)
+    if period == "D":
+        return starts.astype("datetime64[s]").astype("datetime64[D]")
+    if period == "W":
+        monday = (starts + _EPOCH_MONDAY_OFFSET) // _WEEK_SECONDS * _WEEK_SECONDS - _EPOCH_MONDAY_OFFSET
+        return monday.astype("datetime64[s]").astype("datetime64[D]")
+    if period == "M":
+        return starts.astype("datetime64[s]").astype("datetime64[M]")
+    raise ValueError(f"Unsupported period '{period}' (expected 'D', 'W' or 'M')")
+
+
+def zone_distribution_by_period(store, period="W"):
+    """Return (period starts, N_periods x 6 mean zone durations, workout counts)."""
+    return _grouped_means(store.zones, store.valid, period_keys(store.starts, period))
+
+
+if __name__ == "__main__":
+    n = build_zone_store(load_workouts(INPUT_JSON))
+    print(f"💾 Saved {n} workouts to {STORE_DIR}/ ({ZONES_FILE}, {VALID_FILE}, {SPORTS_FILE}, {STARTS_FILE})")